@@ -18,7 +18,14 @@ interact with UNIX and Windows password database.
 """
 
 
+import collections
+import hashlib
+import hmac
+import importlib.util
 import os
+import random
+import threading
+import time
 import warnings
 
 
@@ -165,7 +172,8 @@ class DummyAuthorizer:
                 msg = "Anonymous access not allowed."
             raise AuthenticationFailed(msg)
         if username != 'anonymous':
-            if self.user_table[username]['pwd'] != password:
+            stored = self.user_table[username]['pwd']
+            if not _compare_passwords(stored, password):
                 raise AuthenticationFailed(msg)
 
     def get_home_dir(self, username):
@@ -237,21 +245,17 @@ class DummyAuthorizer:
             return "Goodbye."
 
     def _check_permissions(self, username, perm):
-        warned = 0
-        for p in perm:
-            if p not in self.read_perms + self.write_perms:
-                raise ValueError(f'no such permission {p!r}')
-            if (
-                username == 'anonymous'
-                and p in self.write_perms
-                and not warned
-            ):
-                warnings.warn(
-                    "write permissions assigned to anonymous user.",
-                    RuntimeWarning,
-                    stacklevel=2,
-                )
-                warned = 1
+        perms = set(perm)
+        unknown = perms.difference(self.read_perms, self.write_perms)
+        if unknown:
+            p = next(p for p in perm if p in unknown)
+            raise ValueError(f'no such permission {p!r}')
+        if username == 'anonymous' and not perms.isdisjoint(self.write_perms):
+            warnings.warn(
+                "write permissions assigned to anonymous user.",
+                RuntimeWarning,
+                stacklevel=2,
+            )
 
     def _issubpath(self, a, b):
         """Return True if a is a sub-path of b or if the paths are equal."""
@@ -260,18 +264,20 @@ class DummyAuthorizer:
         return p1[: len(p2)] == p2
 
 
-def replace_anonymous(callable):
-    """A decorator to replace anonymous user string passed to authorizer
-    methods as first argument with the actual user used to handle
-    anonymous sessions.
+def _hash_password(password, salt):
+    """Return a salted digest of password, suitable to be used as a
+    cache key in place of the password itself.
     """
+    return hmac.new(
+        salt, password.encode('utf8', 'surrogatepass'), hashlib.sha256
+    ).digest()
 
-    def wrapper(self, username, *args, **kwargs):
-        if username == 'anonymous':
-            username = self.anonymous_user or username
-        return callable(self, username, *args, **kwargs)
 
-    return wrapper
+def _compare_passwords(a, b):
+    """Compare two passwords in constant time."""
+    return hmac.compare_digest(
+        a.encode('utf8', 'surrogatepass'), b.encode('utf8', 'surrogatepass')
+    )
 
 
 # ===================================================================
@@ -298,7 +304,7 @@ class _Base:
                 "are mutually exclusive"
             )
 
-        users = self._get_system_users()
+        users = frozenset(self._get_system_users())
         for user in self.allowed_users or self.rejected_users:
             if user == 'anonymous':
                 raise AuthorizerError('invalid username "anonymous"')
@@ -345,19 +351,24 @@ class _Base:
         if not self.has_user(username):
             raise AuthorizerError(f'no such user {username}')
 
-        if username in self._dummy_authorizer.user_table:
-            # re-set parameters
-            del self._dummy_authorizer.user_table[username]
-        self._dummy_authorizer.add_user(
-            username,
-            password or "",
-            homedir or os.getcwd(),
-            perm or "",
-            msg_login or "",
-            msg_quit or "",
+        if homedir:
+            if not os.path.isdir(homedir):
+                raise ValueError(f'no such directory: {homedir!r}')
+            homedir = os.path.realpath(homedir)
+        if perm:
+            self._dummy_authorizer._check_permissions(username, perm)
+
+        # re-set parameters, updating the existing entry (if any)
+        entry = self._dummy_authorizer.user_table.setdefault(
+            username, {'operms': {}}
+        )
+        entry.update(
+            pwd=str(password or ""),
+            home=homedir or "",
+            perm=perm or "",
+            msg_login=str(msg_login or ""),
+            msg_quit=str(msg_quit or ""),
         )
-        if homedir is None:
-            self._dummy_authorizer.user_table[username]['home'] = ""
 
     def get_msg_login(self, username):
         return self._get_key(username, 'msg_login') or self.msg_login
@@ -377,8 +388,9 @@ class _Base:
         return perm in self.get_perms(username)
 
     def _get_key(self, username, key):
-        if self._dummy_authorizer.has_user(username):
-            return self._dummy_authorizer.user_table[username][key]
+        entry = self._dummy_authorizer.user_table.get(username)
+        if entry is not None:
+            return entry[key]
 
     def _is_rejected_user(self, username):
         """Return True if the user has been black listed via
@@ -396,9 +408,12 @@ class _Base:
 try:
     with warnings.catch_warnings():
         warnings.simplefilter("ignore")
-        import crypt
         import pwd
         import spwd
+    # importing crypt is slow (it probes all the hashing methods), so
+    # it's done on first use; here we just make sure it's available
+    if importlib.util.find_spec('_crypt') is None:
+        raise ImportError("no module named '_crypt'")
 except ImportError:
     pass
 else:
@@ -408,6 +423,22 @@ else:
     PROCESS_UID = os.getuid()
     PROCESS_GID = os.getgid()
 
+    # the crypt module, imported on first use by _crypt()
+    crypt = None
+    _crypt_import_lock = threading.Lock()
+
+    def _crypt(word, salt):
+        global crypt
+        if crypt is None:
+            # catch_warnings() alters process-wide state and is not
+            # thread-safe: only enter it once
+            with _crypt_import_lock:
+                if crypt is None:
+                    with warnings.catch_warnings():
+                        warnings.simplefilter("ignore")
+                        import crypt  # noqa: PLC0415
+        return crypt.crypt(word, salt)
+
     class BaseUnixAuthorizer:
         """An authorizer compatible with Unix user account and password
         database.
@@ -415,10 +446,41 @@ else:
         Use higher-level UnixAuthorizer class instead.
         """
 
+        # crypt() is slow by design; remember up to this many successful
+        # password verifications for this many seconds
+        crypt_cache_size = 512
+        crypt_cache_timeout = 60
+        # passwd database entries are cached for this many seconds,
+        # up to this many of them
+        pwd_cache_timeout = 60
+        pwd_cache_size = 512
+        # non-existent usernames are remembered for this many seconds
+        # (plus some jitter), up to this many of them
+        nx_cache_timeout = 5
+        nx_cache_size = 256
+
         def __init__(self, anonymous_user=None):
-            if os.geteuid() != 0 or not spwd.getspall():
+            if os.geteuid() != 0:
                 raise AuthorizerError("super user privileges are required")
+            # make sure the shadow password db is readable by probing a
+            # single entry, rather than loading all of them
+            try:
+                spwd.getspnam(pwd.getpwuid(0).pw_name)
+            except PermissionError:
+                raise AuthorizerError("super user privileges are required")
+            except KeyError:
+                pass
             self.anonymous_user = anonymous_user
+            self._crypt_cache = collections.OrderedDict()
+            self._crypt_cache_lock = threading.Lock()
+            # used to salt cached password digests
+            self._crypt_cache_salt = os.urandom(32)
+            # {username: (timestamp, struct_passwd)}
+            self._pwd_cache = collections.OrderedDict()
+            self._pwd_cache_lock = threading.Lock()
+            # {username: expiration time}
+            self._nx_cache = collections.OrderedDict()
+            self._nx_cache_lock = threading.Lock()
 
             if self.anonymous_user is not None:
                 try:
@@ -437,21 +499,49 @@ else:
                     raise AuthenticationFailed(self.msg_anon_not_allowed)
             else:
                 try:
+                    self._getpwnam(username)
                     pw1 = spwd.getspnam(username).sp_pwd
-                    pw2 = crypt.crypt(password, pw1)
                 except KeyError:  # no such username
                     raise AuthenticationFailed(self.msg_no_such_user)
-                else:
-                    if pw1 != pw2:
-                        raise AuthenticationFailed(self.msg_wrong_password)
+                if not self._check_password(username, password, pw1):
+                    raise AuthenticationFailed(self.msg_wrong_password)
+
+        def _check_password(self, username, password, pwhash):
+            """Return True if password matches the shadow password
+            hash. Successful matches are cached for `crypt_cache_timeout`
+            seconds, keyed by a salted digest of the password (the
+            password itself is never stored). Failures are not cached,
+            so that wrong passwords (e.g. brute force attempts) can't
+            evict legitimate entries.
+            """
+            digest = _hash_password(password, self._crypt_cache_salt)
+            key = (username, pwhash, digest)
+            now = time.monotonic()
+            with self._crypt_cache_lock:
+                timestamp = self._crypt_cache.get(key)
+                if timestamp is not None:
+                    if now - timestamp < self.crypt_cache_timeout:
+                        self._crypt_cache.move_to_end(key)
+                        return True
+                    del self._crypt_cache[key]
+
+            pw2 = _crypt(password, pwhash)
+            if pw2 is None or not hmac.compare_digest(pw2, pwhash):
+                return False
+            with self._crypt_cache_lock:
+                self._crypt_cache[key] = now
+                while len(self._crypt_cache) > self.crypt_cache_size:
+                    self._crypt_cache.popitem(last=False)
+            return True
 
-        @replace_anonymous
         def impersonate_user(self, username, password):
             """Change process effective user/group ids to reflect
             logged in user.
             """
+            if username == 'anonymous':
+                username = self.anonymous_user or username
             try:
-                pwdstruct = pwd.getpwnam(username)
+                pwdstruct = self._getpwnam(username)
             except KeyError:
                 raise AuthorizerError(self.msg_no_such_user)
             else:
@@ -463,22 +553,68 @@ else:
             os.setegid(PROCESS_GID)
             os.seteuid(PROCESS_UID)
 
-        @replace_anonymous
         def has_user(self, username):
             """Return True if user exists on the Unix system.
             If the user has been black listed via allowed_users or
             rejected_users options always return False.
             """
-            return username in self._get_system_users()
+            if username == 'anonymous':
+                username = self.anonymous_user or username
+            # a single lookup rather than enumerating the whole user
+            # database, which can be slow (e.g. LDAP)
+            try:
+                self._getpwnam(username)
+            except KeyError:
+                return False
+            return True
 
-        @replace_anonymous
         def get_home_dir(self, username):
             """Return user home directory."""
+            if username == 'anonymous':
+                username = self.anonymous_user or username
             try:
-                return pwd.getpwnam(username).pw_dir
+                return self._getpwnam(username).pw_dir
             except KeyError:
                 raise AuthorizerError(self.msg_no_such_user)
 
+        def _getpwnam(self, username):
+            """A cached version of pwd.getpwnam(). Entries expire after
+            `pwd_cache_timeout` seconds. This is used on every
+            filesystem access (see impersonate_user()), and on NSS
+            setups backed by a remote directory (e.g. LDAP) each lookup
+            may be a network round trip.
+            Non-existent users are remembered as well (for a shorter
+            time), so that a storm of logins with made up usernames
+            doesn't hit the user database every time.
+            """
+            now = time.monotonic()
+            with self._pwd_cache_lock:
+                entry = self._pwd_cache.get(username)
+                if entry is not None:
+                    if now - entry[0] < self.pwd_cache_timeout:
+                        self._pwd_cache.move_to_end(username)
+                        return entry[1]
+                    del self._pwd_cache[username]
+            expires = self._nx_cache.get(username)
+            if expires is not None and now < expires:
+                raise KeyError(f"getpwnam(): name not found: {username!r}")
+            try:
+                pwdstruct = pwd.getpwnam(username)
+            except KeyError:
+                timeout = self.nx_cache_timeout * random.uniform(1, 1.5)
+                with self._nx_cache_lock:
+                    self._nx_cache[username] = now + timeout
+                    self._nx_cache.move_to_end(username)
+                    while len(self._nx_cache) > self.nx_cache_size:
+                        self._nx_cache.popitem(last=False)
+                raise
+            with self._pwd_cache_lock:
+                self._pwd_cache[username] = (now, pwdstruct)
+                self._pwd_cache.move_to_end(username)
+                while len(self._pwd_cache) > self.pwd_cache_size:
+                    self._pwd_cache.popitem(last=False)
+            return pwdstruct
+
         @staticmethod
         def _get_system_users():
             """Return all users defined on the UNIX system."""
@@ -517,6 +653,9 @@ else:
          >>> auth.override_user("matt", password="foo", perm="elr")
         """
 
+        # (mtime, frozenset) of /etc/shells, see _get_valid_shells()
+        _shells_cache = None
+
         # --- public API
 
         def __init__(
@@ -565,13 +704,10 @@ else:
                the string sent when client quits.
             """
             BaseUnixAuthorizer.__init__(self, anonymous_user)
-            if allowed_users is None:
-                allowed_users = []
-            if rejected_users is None:
-                rejected_users = []
             self.global_perm = global_perm
-            self.allowed_users = allowed_users
-            self.rejected_users = rejected_users
+            # looked up on every login: store them as sets
+            self.allowed_users = frozenset(allowed_users or ())
+            self.rejected_users = frozenset(rejected_users or ())
             self.anonymous_user = anonymous_user
             self.require_valid_shell = require_valid_shell
             self.msg_login = msg_login
@@ -617,7 +753,7 @@ else:
                 raise AuthenticationFailed(self.msg_rejected_user % username)
             overridden_password = self._get_key(username, 'pwd')
             if overridden_password:
-                if overridden_password != password:
+                if not _compare_passwords(overridden_password, password):
                     raise AuthenticationFailed(self.msg_wrong_password)
             else:
                 BaseUnixAuthorizer.validate_authentication(
@@ -629,41 +765,51 @@ else:
                         self.msg_invalid_shell % username
                     )
 
-        @replace_anonymous
         def has_user(self, username):
+            if username == 'anonymous':
+                username = self.anonymous_user or username
             if self._is_rejected_user(username):
                 return False
-            return username in self._get_system_users()
+            return BaseUnixAuthorizer.has_user(self, username)
 
-        @replace_anonymous
         def get_home_dir(self, username):
+            if username == 'anonymous':
+                username = self.anonymous_user or username
             overridden_home = self._get_key(username, 'home')
             if overridden_home:
                 return overridden_home
             return BaseUnixAuthorizer.get_home_dir(self, username)
 
-        @staticmethod
-        def _has_valid_shell(username):
-            """Return True if the user has a valid shell binary listed
-            in /etc/shells. If /etc/shells can't be found return True.
+        def _get_valid_shells(self):
+            """Return the set of shells listed in /etc/shells or None if
+            the file can't be found. The file is parsed again only if
+            its modification time changes.
             """
             try:
-                file = open('/etc/shells')
+                mtime = os.stat('/etc/shells').st_mtime_ns
             except FileNotFoundError:
+                return None
+            cache = self._shells_cache
+            if cache is None or cache[0] != mtime:
+                with open('/etc/shells') as f:
+                    shells = frozenset(
+                        line.strip() for line in f if not line.startswith('#')
+                    )
+                cache = self._shells_cache = (mtime, shells)
+            return cache[1]
+
+        def _has_valid_shell(self, username):
+            """Return True if the user has a valid shell binary listed
+            in /etc/shells. If /etc/shells can't be found return True.
+            """
+            shells = self._get_valid_shells()
+            if shells is None:
                 return True
-            else:
-                with file:
-                    try:
-                        shell = pwd.getpwnam(username).pw_shell
-                    except KeyError:  # invalid user
-                        return False
-                    for line in file:
-                        if line.startswith('#'):
-                            continue
-                        line = line.strip()
-                        if line == shell:
-                            return True
-                    return False
+            try:
+                shell = self._getpwnam(username).pw_shell
+            except KeyError:  # invalid user
+                return False
+            return shell in shells
 
 
 # ===================================================================
@@ -691,10 +837,18 @@ else:  # pragma: no cover
         Use higher-level WinowsAuthorizer class instead.
         """
 
+        # logon tokens are reused by impersonate_user(): keep up to
+        # this many of them around for this many seconds
+        token_cache_size = 64
+        token_cache_timeout = 60
+        # the list of system users is cached for this many seconds
+        users_cache_timeout = 30
+
         def __init__(self, anonymous_user=None, anonymous_password=None):
             # actually try to impersonate the user
             self.anonymous_user = anonymous_user
             self.anonymous_password = anonymous_password
+            self._init_caches()
             if self.anonymous_user is not None:
                 self.impersonate_user(
                     self.anonymous_user, self.anonymous_password
@@ -706,43 +860,114 @@ else:  # pragma: no cover
                 if self.anonymous_user is None:
                     raise AuthenticationFailed(self.msg_anon_not_allowed)
                 return
+            # always ask Windows, so that a changed password or a
+            # disabled account is noticed; the fresh token replaces
+            # the cached one
             try:
-                win32security.LogonUser(
-                    username,
-                    None,
-                    password,
-                    win32con.LOGON32_LOGON_INTERACTIVE,
-                    win32con.LOGON32_PROVIDER_DEFAULT,
-                )
+                token = self._logon_user(username, password)
             except pywintypes.error:
                 raise AuthenticationFailed(self.msg_wrong_password)
+            with self._tokens_lock:
+                self._cache_token(self._token_key(username, password), token)
 
-        @replace_anonymous
         def impersonate_user(self, username, password):
             """Impersonate the security context of another user."""
-            handler = win32security.LogonUser(
+            if username == 'anonymous':
+                username = self.anonymous_user or username
+            key = self._token_key(username, password)
+            with self._tokens_lock:
+                token = self._get_cached_token(key)
+                if token is not None:
+                    win32security.ImpersonateLoggedOnUser(token)
+                    return
+            # LogonUser() may be a round trip to the domain controller:
+            # don't hold the lock while waiting for it
+            token = self._logon_user(username, password)
+            with self._tokens_lock:
+                self._cache_token(key, token)
+                win32security.ImpersonateLoggedOnUser(token)
+
+        def _init_caches(self):
+            self._home_cache = {}
+            # (timestamp, frozenset(usernames))
+            self._users_cache = None
+            # {(username, digest): (timestamp, token)}
+            self._tokens = collections.OrderedDict()
+            self._tokens_lock = threading.Lock()
+            # used to salt cached password digests
+            self._tokens_salt = os.urandom(32)
+
+        def _logon_user(self, username, password):
+            """Log on the user and return its token handle."""
+            return win32security.LogonUser(
                 username,
                 None,
                 password,
                 win32con.LOGON32_LOGON_INTERACTIVE,
                 win32con.LOGON32_PROVIDER_DEFAULT,
             )
-            win32security.ImpersonateLoggedOnUser(handler)
-            handler.Close()
+
+        def _token_key(self, username, password):
+            digest = _hash_password(password or "", self._tokens_salt)
+            return (username, digest)
+
+        def _get_cached_token(self, key):
+            """Return the cached token for key or None if there is none
+            or it is older than `token_cache_timeout` seconds. Must be
+            called with _tokens_lock held.
+            """
+            entry = self._tokens.get(key)
+            if entry is None:
+                return None
+            timestamp, token = entry
+            if time.monotonic() - timestamp >= self.token_cache_timeout:
+                del self._tokens[key]
+                token.Close()
+                return None
+            self._tokens.move_to_end(key)
+            return token
+
+        def _cache_token(self, key, token):
+            """Cache token, closing the ones it replaces or evicts.
+            Must be called with _tokens_lock held.
+            """
+            old = self._tokens.pop(key, None)
+            if old is not None:
+                old[1].Close()
+            self._tokens[key] = (time.monotonic(), token)
+            while len(self._tokens) > self.token_cache_size:
+                self._tokens.popitem(last=False)[1][1].Close()
 
         def terminate_impersonation(self, username):
             """Terminate the impersonation of another user."""
             win32security.RevertToSelf()
 
-        @replace_anonymous
         def has_user(self, username):
-            return username in self._get_system_users()
+            if username == 'anonymous':
+                username = self.anonymous_user or username
+            # enumerating users is slow (especially on a domain): do it
+            # once every `users_cache_timeout` seconds at most
+            now = time.monotonic()
+            cache = self._users_cache
+            if cache is None or now - cache[0] >= self.users_cache_timeout:
+                cache = (now, frozenset(self._get_system_users()))
+                self._users_cache = cache
+            return username in cache[1]
 
-        @replace_anonymous
         def get_home_dir(self, username):
             """Return the user's profile directory, the closest thing
             to a user home directory we have on Windows.
             """
+            if username == 'anonymous':
+                username = self.anonymous_user or username
+            # profile directories practically never change while the
+            # server is running: avoid hitting the registry every time.
+            # Windows user names are case insensitive.
+            cache_key = username.lower()
+            try:
+                return self._home_cache[cache_key]
+            except KeyError:
+                pass
             try:
                 sid = win32security.ConvertSidToStringSid(
                     win32security.LookupAccountName(None, username)[0]
@@ -757,8 +982,10 @@ else:  # pragma: no cover
                 raise AuthorizerError(
                     f"No profile directory defined for user {username}"
                 )
-            value = winreg.QueryValueEx(key, "ProfileImagePath")[0]
+            with key:
+                value = winreg.QueryValueEx(key, "ProfileImagePath")[0]
             home = win32api.ExpandEnvironmentStrings(value)
+            self._home_cache[cache_key] = home
             return home
 
         @classmethod
@@ -846,17 +1073,15 @@ else:  # pragma: no cover
             - (string) msg_quit:
                the string sent when client quits.
             """
-            if allowed_users is None:
-                allowed_users = []
-            if rejected_users is None:
-                rejected_users = []
             self.global_perm = global_perm
-            self.allowed_users = allowed_users
-            self.rejected_users = rejected_users
+            # looked up on every login: store them as sets
+            self.allowed_users = frozenset(allowed_users or ())
+            self.rejected_users = frozenset(rejected_users or ())
             self.anonymous_user = anonymous_user
             self.anonymous_password = anonymous_password
             self.msg_login = msg_login
             self.msg_quit = msg_quit
+            self._init_caches()
             self._dummy_authorizer = DummyAuthorizer()
             self._dummy_authorizer._check_permissions('', global_perm)
             _Base.__init__(self)
@@ -893,14 +1118,11 @@ else:  # pragma: no cover
                 if self.anonymous_user is None:
                     raise AuthenticationFailed(self.msg_anon_not_allowed)
                 return
-            if self.allowed_users and username not in self.allowed_users:
-                raise AuthenticationFailed(self.msg_rejected_user % username)
-            if self.rejected_users and username in self.rejected_users:
+            if self._is_rejected_user(username):
                 raise AuthenticationFailed(self.msg_rejected_user % username)
-
             overridden_password = self._get_key(username, 'pwd')
             if overridden_password:
-                if overridden_password != password:
+                if not _compare_passwords(overridden_password, password):
                     raise AuthenticationFailed(self.msg_wrong_password)
             else:
                 BaseWindowsAuthorizer.validate_authentication(
@@ -914,14 +1136,16 @@ else:  # pragma: no cover
                 password = self.anonymous_password or ""
             BaseWindowsAuthorizer.impersonate_user(self, username, password)
 
-        @replace_anonymous
         def has_user(self, username):
+            if username == 'anonymous':
+                username = self.anonymous_user or username
             if self._is_rejected_user(username):
                 return False
-            return username in self._get_system_users()
+            return BaseWindowsAuthorizer.has_user(self, username)
 
-        @replace_anonymous
         def get_home_dir(self, username):
+            if username == 'anonymous':
+                username = self.anonymous_user or username
             overridden_home = self._get_key(username, 'home')
             if overridden_home:
                 home = overridden_home
@@ -87,6 +87,9 @@ class AbstractedFS:
     to the client.
     """
 
+    # (root, realpath(root)) cached by _get_real_root()
+    _real_root = None
+
     def __init__(self, root, cmd_channel):
         """
         - (str) root: the user "real" home directory (e.g. '/home/user')
@@ -217,14 +220,65 @@ class AbstractedFS:
         Pathnames escaping from user's root directory are considered
         not valid.
         """
-        root = self.realpath(self.root)
+        root = self._get_real_root()
+        if self._is_real_subpath(path, root):
+            return True
         path = self.realpath(path)
-        if not root.endswith(os.sep):
-            root += os.sep
         if not path.endswith(os.sep):
             path += os.sep
         return path[0 : len(root)] == root
 
+    def _is_real_subpath(self, path, root):
+        """Return True if path is a normalized pathname below the
+        resolved root directory and none of its components below root
+        is a symbolic link. Such a path is its own realpath(), which
+        is a lot more expensive since it lstat()s every component
+        starting from "/". On False validpath() falls back on
+        realpath().
+        Subclasses overriding realpath() or lstat() (e.g. virtual
+        filesystems) always go through realpath().
+        """
+        if os.name != 'posix' or os.path.normpath(path) != path:
+            return False
+        cls = type(self)
+        if (
+            cls.realpath is not AbstractedFS.realpath
+            or cls.lstat is not AbstractedFS.lstat
+        ):
+            return False
+        if not (path + os.sep).startswith(root):
+            return False
+        current = root[:-1]
+        for name in path[len(root) :].split(os.sep):
+            if not name:
+                continue
+            current += os.sep + name
+            try:
+                st = os.lstat(current)
+            except OSError:
+                # not existing (or not accessible): neither this
+                # component nor the ones after it can be resolved
+                # by realpath() either
+                return True
+            if stat.S_ISLNK(st.st_mode):
+                return False
+        return True
+
+    def _get_real_root(self):
+        """Return the resolved root directory (with a trailing
+        separator) used by validpath(). The result is cached until
+        root changes, since the root directory itself is not expected
+        to be swapped with a symlink while the session is running.
+        """
+        root = self.root
+        cached = self._real_root
+        if cached is None or cached[0] != root:
+            real = self.realpath(root)
+            if not real.endswith(os.sep):
+                real += os.sep
+            cached = self._real_root = (root, real)
+        return cached[1]
+
     # --- Wrapper methods around open() and tempfile.mkstemp
 
     def open(self, filename, mode):
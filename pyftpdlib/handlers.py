@@ -3294,6 +3294,8 @@ if SSL is not None:
             """
             debug("securing SSL connection", self)
             self._ssl_requested = True
+            # the plain socket, used by _do_ssl_shutdown()
+            self._raw_socket = self.socket
             try:
                 self.socket = SSL.Connection(ssl_context, self.socket)
             except OSError as err:
@@ -3318,11 +3320,18 @@ if SSL is not None:
                 self.socket.set_accept_state()
                 self._ssl_accepting = True
 
-        @contextlib.contextmanager
-        def _handle_ssl_want_rw(self):
-            prev_row_pending = self._ssl_want_read or self._ssl_want_write
+        def _handle_ssl_event(self, handle_event, pending):
+            """Dispatch a read or write event depending on the SSL
+            state, then update the IOLoop events according to the
+            direction OpenSSL is waiting for (if any).
+            """
             try:
-                yield
+                if self._ssl_accepting:
+                    self._do_ssl_handshake()
+                elif self._ssl_closing:
+                    self._do_ssl_shutdown()
+                else:
+                    handle_event()
             except SSL.WantReadError:
                 # we should never get here; it's just for extra safety
                 self._ssl_want_read = True
@@ -3338,11 +3347,10 @@ if SSL is not None:
                 self.modify_ioloop_events(
                     self._wanted_io_events | self.ioloop.WRITE, logdebug=True
                 )
-            elif prev_row_pending:
+            elif pending:
                 self.modify_ioloop_events(self._wanted_io_events)
 
         def _do_ssl_handshake(self):
-            self._ssl_accepting = True
             self._ssl_want_read = False
             self._ssl_want_write = False
             try:
@@ -3392,27 +3400,17 @@ if SSL is not None:
             if not self._ssl_requested:
                 super().handle_read_event()
             else:
-                with self._handle_ssl_want_rw():
-                    self._ssl_want_read = False
-                    if self._ssl_accepting:
-                        self._do_ssl_handshake()
-                    elif self._ssl_closing:
-                        self._do_ssl_shutdown()
-                    else:
-                        super().handle_read_event()
+                pending = self._ssl_want_read or self._ssl_want_write
+                self._ssl_want_read = False
+                self._handle_ssl_event(super().handle_read_event, pending)
 
         def handle_write_event(self):
             if not self._ssl_requested:
                 super().handle_write_event()
             else:
-                with self._handle_ssl_want_rw():
-                    self._ssl_want_write = False
-                    if self._ssl_accepting:
-                        self._do_ssl_handshake()
-                    elif self._ssl_closing:
-                        self._do_ssl_shutdown()
-                    else:
-                        super().handle_write_event()
+                pending = self._ssl_want_read or self._ssl_want_write
+                self._ssl_want_write = False
+                self._handle_ssl_event(super().handle_write_event, pending)
 
         def handle_error(self):
             self._error = True
@@ -3498,13 +3496,13 @@ if SSL is not None:
             self._ssl_closing = True
             if os.name == 'posix':
                 # since SSL_shutdown() doesn't report errors, an empty
-                # write call is done first, to try to detect if the
-                # connection has gone away
+                # non-blocking send() is done first on the plain socket,
+                # to try to detect if the connection has gone away
                 try:
-                    os.write(self.socket.fileno(), b'')
+                    self._raw_socket.send(b'', socket.MSG_DONTWAIT)
                 except OSError as err:
                     debug(
-                        f"call: _do_ssl_shutdown() -> os.write, err: {err!r}",
+                        f"call: _do_ssl_shutdown() -> send, err: {err!r}",
                         inst=self,
                     )
                     if err.errno in {
@@ -3616,13 +3614,26 @@ if SSL is not None:
         def __init__(self, sock, cmd_channel):
             super().__init__(sock, cmd_channel)
             if self.cmd_channel._prot:
+                # with Nagle enabled the tail of each TLS record may be
+                # held back waiting for a delayed ACK
+                if self.cmd_channel.tcp_no_delay:
+                    try:
+                        self.socket.setsockopt(
+                            socket.SOL_TCP, socket.TCP_NODELAY, 1
+                        )
+                    except OSError as err:
+                        debug(
+                            "call: TLS_DTPHandler.__init__, err on "
+                            f"TCP_NODELAY {err!r}",
+                            self,
+                        )
                 self.secure_connection(self.cmd_channel.ssl_context)
 
         def __repr__(self):
             return DTPHandler.__repr__(self)
 
         def use_sendfile(self):
-            if isinstance(self.socket, SSL.Connection):
+            if self._ssl_accepting or self._ssl_established:
                 return False
             else:
                 return super().use_sendfile()
@@ -3674,7 +3685,8 @@ if SSL is not None:
 
          - (int) ssl_options:
             specific OpenSSL options. These default to:
-            SSL.OP_NO_SSLv2 | SSL.OP_NO_SSLv3 | SSL.OP_NO_COMPRESSION
+            SSL.OP_NO_SSLv2 | SSL.OP_NO_SSLv3 | SSL.OP_NO_TLSv1 |
+            SSL.OP_NO_TLSv1_1 | SSL.OP_NO_COMPRESSION
             ...which are all considered insecure features.
             Can be set to None in order to improve compatibility with
             older (insecure) FTP clients.
@@ -3694,13 +3706,25 @@ if SSL is not None:
         ssl_protocol = SSL.TLS_SERVER_METHOD
         # - SSLv2 is easily broken and is considered harmful and dangerous
         # - SSLv3 has several problems and is now dangerous
+        # - TLSv1 and TLSv1.1 are deprecated (RFC-8996) and lack the
+        #   AEAD ciphers (AES-GCM, ChaCha20) which are hardware
+        #   accelerated on modern CPUs
         # - Disable compression to prevent CRIME attacks for OpenSSL 1.0+
         #   (see https://github.com/shazow/urllib3/pull/309)
-        ssl_options = SSL.OP_NO_SSLv2 | SSL.OP_NO_SSLv3
+        ssl_options = (
+            SSL.OP_NO_SSLv2
+            | SSL.OP_NO_SSLv3
+            | SSL.OP_NO_TLSv1
+            | SSL.OP_NO_TLSv1_1
+        )
         if hasattr(SSL, "OP_NO_COMPRESSION"):
             ssl_options |= SSL.OP_NO_COMPRESSION
         ssl_context = None
 
+        # commands refused if tls_control_required / tls_data_required
+        _tls_control_cmds = frozenset(('USER', 'PASS'))
+        _tls_data_cmds = frozenset(('PASV', 'EPSV', 'PORT', 'EPRT'))
+
         # overridden attributes
         dtp_handler = TLS_DTPHandler
         proto_cmds = FTPHandler.proto_cmds.copy()
@@ -3754,6 +3778,11 @@ if SSL is not None:
                 cls.ssl_context.use_privatekey_file(cls.keyfile)
                 if cls.ssl_options:
                     cls.ssl_context.set_options(cls.ssl_options)
+                # OpenSSL refuses to resume sessions (e.g. the data
+                # channel reusing the control channel's session) when
+                # peer verification is on, unless a session id context
+                # is set
+                cls.ssl_context.set_session_id(b"pyftpdlib")
             return cls.ssl_context
 
         # --- overridden methods
@@ -3764,18 +3793,24 @@ if SSL is not None:
             self._prot = False
 
         def process_command(self, cmd, *args, **kwargs):
-            if cmd in ('USER', 'PASS'):
-                if self.tls_control_required and not self._ssl_established:
-                    msg = "SSL/TLS required on the control channel."
-                    self.respond("550 " + msg)
-                    self.log_cmd(cmd, args[0], 550, msg)
-                    return
-            elif cmd in ('PASV', 'EPSV', 'PORT', 'EPRT'):
-                if self.tls_data_required and not self._prot:
-                    msg = "SSL/TLS required on the data channel."
-                    self.respond("550 " + msg)
-                    self.log_cmd(cmd, args[0], 550, msg)
-                    return
+            if (
+                self.tls_control_required
+                and cmd in self._tls_control_cmds
+                and not self._ssl_established
+            ):
+                msg = "SSL/TLS required on the control channel."
+                self.respond("550 " + msg)
+                self.log_cmd(cmd, args[0], 550, msg)
+                return
+            if (
+                self.tls_data_required
+                and cmd in self._tls_data_cmds
+                and not self._prot
+            ):
+                msg = "SSL/TLS required on the data channel."
+                self.respond("550 " + msg)
+                self.log_cmd(cmd, args[0], 550, msg)
+                return
             FTPHandler.process_command(self, cmd, *args, **kwargs)
 
         def close(self):
@@ -3795,9 +3830,9 @@ if SSL is not None:
         def ftp_AUTH(self, line):
             """Set up secure control channel."""
             arg = line.upper()
-            if isinstance(self.socket, SSL.Connection):
+            if self._ssl_accepting or self._ssl_established:
                 self.respond("503 Already using TLS.")
-            elif arg in ('TLS', 'TLS-C', 'SSL', 'TLS-P'):
+            elif arg in {'TLS', 'TLS-C', 'SSL', 'TLS-P'}:
                 # From RFC-4217: "As the SSL/TLS protocols self-negotiate
                 # their levels, there is no need to distinguish between SSL
                 # and TLS in the application layer".
@@ -3813,7 +3848,7 @@ if SSL is not None:
             For TLS/SSL the only valid value for the parameter is '0'.
             Any other value is accepted but ignored.
             """
-            if not isinstance(self.socket, SSL.Connection):
+            if not self._ssl_established:
                 self.respond(
                     "503 PBSZ not allowed on insecure control connection."
                 )
@@ -3824,7 +3859,7 @@ if SSL is not None:
         def ftp_PROT(self, line):
             """Setup un/secure data channel."""
             arg = line.upper()
-            if not isinstance(self.socket, SSL.Connection):
+            if not self._ssl_established:
                 self.respond(
                     "503 PROT not allowed on insecure control connection."
                 )
@@ -3838,7 +3873,7 @@ if SSL is not None:
             elif arg == 'P':
                 self.respond('200 Protection set to Private')
                 self._prot = True
-            elif arg in ('S', 'E'):
+            elif arg in {'S', 'E'}:
                 self.respond(f'521 PROT {arg} unsupported (use C or P).')
             else:
                 self.respond("502 Unrecognized PROT type (use C or P).")
@@ -23,7 +23,16 @@ _task_id = None
 
 
 def cpu_count():
-    """Returns the number of processors on this machine."""
+    """Returns the number of processors the current process is allowed
+    to run on (e.g. restricted via taskset, cgroups cpusets or
+    containers), falling back on the number of processors on this
+    machine if that can't be determined.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        try:
+            return len(os.sched_getaffinity(0))
+        except OSError:
+            pass
     if multiprocessing is None:
         return 1
     try:
@@ -218,8 +218,8 @@ class FTPServer(Acceptor):
           processes before starting.
           Each child process will keep using a 1-thread, async
           concurrency model, handling multiple concurrent connections.
-          If the number is None or <= 0 the number of usable cores
-          available on this machine is detected and used.
+          If the number is None or <= 0 the number of cores the
+          process is allowed to run on is detected and used.
           It is a good idea to use this option in case the app risks
           blocking for too long on a single function call (e.g.
           hard-disk is slow, long DB query on auth etc.).
@@ -406,12 +406,11 @@ class _SpawnerBase(FTPServer):
             # Here we localize variable access to minimize overhead.
             poll = ioloop.poll
             sched_poll = ioloop.sched.poll
+            exiting = self._exit.is_set
             poll_timeout = getattr(self, 'poll_timeout', None)
             soonest_timeout = poll_timeout
 
-            while (
-                ioloop.socket_map or ioloop.sched._tasks
-            ) and not self._exit.is_set():
+            while (ioloop.socket_map or ioloop.sched._tasks) and not exiting():
                 try:
                     if ioloop.socket_map:
                         poll(timeout=soonest_timeout)
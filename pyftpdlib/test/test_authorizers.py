@@ -30,6 +30,10 @@ if POSIX:
         from pyftpdlib.authorizers import UnixAuthorizer
     except ImportError:
         UnixAuthorizer = None
+    else:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            import crypt
 else:
     UnixAuthorizer = None
 
@@ -111,6 +115,15 @@ class TestDummyAuthorizer(PyftpdlibTestCase):
             ):
                 auth.add_anonymous(HOME, perm=x)
 
+    def test_validate_authentication_unicode(self):
+        auth = DummyAuthorizer()
+        auth.add_user(USER, 'p\u00e0sswd\u20ac', HOME)
+        auth.validate_authentication(USER, 'p\u00e0sswd\u20ac', None)
+        with pytest.raises(AuthenticationFailed):
+            auth.validate_authentication(USER, 'passwd\u20ac', None)
+        with pytest.raises(AuthenticationFailed):
+            auth.validate_authentication(USER, '', None)
+
     def test_override_perm_interface(self):
         auth = DummyAuthorizer()
         auth.add_user(USER, PASSWD, HOME, perm='elr')
@@ -321,6 +334,9 @@ class _SharedAuthorizerTests:
         auth = self.authorizer_class(global_perm='elr')
         assert auth.has_perm(self.get_current_user(), 'r')
         assert not auth.has_perm(self.get_current_user(), 'w')
+        # changing global_perm is immediately reflected
+        auth.global_perm = 'elradfmwMT'
+        assert auth.has_perm(self.get_current_user(), 'w')
 
     def test_messages(self):
         auth = self.authorizer_class(msg_login="login", msg_quit="quit")
@@ -414,6 +430,21 @@ class _SharedAuthorizerTests:
         # self.assertEqual(auth.get_msg_login(user), "Login successful.")
         # self.assertEqual(auth.get_msg_quit(user), "Goodbye.")
 
+    def test_override_user_twice(self):
+        auth = self.authorizer_class()
+        user = self.get_current_user()
+        auth.override_user(user, perm="elr", msg_login="foo")
+        assert auth.get_perms(user) == "elr"
+        assert not auth.has_perm(user, 'w')
+        # options not specified again are reset to their defaults
+        auth.override_user(user, msg_quit="bar")
+        assert auth.get_perms(user) == "elradfmwMT"
+        assert auth.has_perm(user, 'w')
+        assert auth.get_msg_login(user) == "Login successful."
+        assert auth.get_msg_quit(user) == "bar"
+        with pytest.raises(ValueError, match='no such directory'):
+            auth.override_user(user, homedir='?:\\')
+
     def test_override_user_errors(self):
         if self.authorizer_class.__name__ == 'UnixAuthorizer':
             auth = self.authorizer_class(require_valid_shell=False)
@@ -537,6 +568,72 @@ class TestUnixAuthorizer(_SharedAuthorizerTests, PyftpdlibTestCase):
                 None,
             )
 
+    def test_check_password_cache(self):
+        auth = UnixAuthorizer(require_valid_shell=False)
+        user = self.get_current_user()
+        pwhash = crypt.crypt('secret', crypt.mksalt())
+        assert auth._check_password(user, 'secret', pwhash)
+        assert len(auth._crypt_cache) == 1
+        # cache hit
+        assert auth._check_password(user, 'secret', pwhash)
+        assert len(auth._crypt_cache) == 1
+        # failures are not cached
+        assert not auth._check_password(user, 'wrong', pwhash)
+        assert len(auth._crypt_cache) == 1
+        # the password itself is never stored
+        for key in auth._crypt_cache:
+            assert 'secret' not in key
+        # a different shadow hash (e.g. password changed) is a miss
+        pwhash2 = crypt.crypt('secret2', crypt.mksalt())
+        assert not auth._check_password(user, 'secret', pwhash2)
+        assert auth._check_password(user, 'secret2', pwhash2)
+        assert len(auth._crypt_cache) == 2
+        # size limit
+        auth.crypt_cache_size = 1
+        assert auth._check_password(user, 'secret3', crypt.crypt('secret3'))
+        assert len(auth._crypt_cache) == 1
+
+    def test_pwd_cache(self):
+        auth = UnixAuthorizer()
+        user = self.get_current_user()
+        try:
+            auth.impersonate_user(user, '')
+            assert auth._pwd_cache[user][1] == pwd.getpwnam(user)
+            auth.impersonate_user(user, '')
+            with pytest.raises(AuthorizerError):
+                auth.impersonate_user(self.get_nonexistent_user(), '')
+        finally:
+            auth.terminate_impersonation(user)
+        assert list(auth._pwd_cache) == [user]
+        assert auth.get_home_dir(user) == pwd.getpwnam(user).pw_dir
+        # expired entries are looked up again
+        auth._pwd_cache[user] = (-auth.pwd_cache_timeout, None)
+        assert auth.has_user(user)
+        assert auth._pwd_cache[user][1] == pwd.getpwnam(user)
+        # size limit
+        auth.pwd_cache_size = 1
+        other_user = next(
+            x.pw_name for x in pwd.getpwall() if x.pw_name != user
+        )
+        assert auth.has_user(other_user)
+        assert list(auth._pwd_cache) == [other_user]
+
+    def test_pwd_cache_nonexistent_users(self):
+        auth = UnixAuthorizer(require_valid_shell=False)
+        nonexistent_user = self.get_nonexistent_user()
+        assert not auth.has_user(nonexistent_user)
+        assert list(auth._nx_cache) == [nonexistent_user]
+        with pytest.raises(AuthenticationFailed):
+            auth.validate_authentication(nonexistent_user, 'passwd', None)
+        with pytest.raises(AuthorizerError):
+            auth.get_home_dir(nonexistent_user)
+        assert list(auth._nx_cache) == [nonexistent_user]
+        assert nonexistent_user not in auth._pwd_cache
+        # size limit
+        auth.nx_cache_size = 1
+        assert not auth.has_user(nonexistent_user + 'x')
+        assert list(auth._nx_cache) == [nonexistent_user + 'x']
+
     def test_validate_authentication_anonymous(self):
         current_user = self.get_current_user()
         auth = UnixAuthorizer(
@@ -583,6 +680,10 @@ class TestUnixAuthorizer(_SharedAuthorizerTests, PyftpdlibTestCase):
         auth = UnixAuthorizer()
         assert auth._has_valid_shell(self.get_current_user())
         assert not auth._has_valid_shell(user)
+        # /etc/shells is parsed only once
+        if os.path.isfile('/etc/shells'):
+            shells = auth._get_valid_shells()
+            assert auth._get_valid_shells() is shells
         self.assertRaisesWithMsg(
             AuthorizerError,
             f"User {user} doesn't have a valid shell.",
@@ -162,6 +162,34 @@ class TestAbstractedFS(PyftpdlibTestCase):
         assert fs.validpath(HOME + '/')
         assert not fs.validpath(HOME + 'bar')
 
+    def test_validpath_root_change(self):
+        # the resolved root is cached, make sure it's invalidated
+        # when root changes
+        fs = AbstractedFS(HOME, None)
+        subdir = self.get_testfn(dir=HOME)
+        os.mkdir(subdir)
+        assert fs.validpath(HOME)
+        fs.root = subdir
+        assert not fs.validpath(HOME)
+        assert fs.validpath(subdir)
+        fs._root = HOME
+        assert fs.validpath(HOME)
+
+    def test_validpath_overridden_realpath(self):
+        # a subclass overriding realpath() must have it honored, also
+        # for paths which look like plain paths below root
+        escaping = os.path.join(HOME, 'foo')
+
+        class FS(AbstractedFS):
+            def realpath(self, path):
+                if path == escaping:
+                    return os.path.dirname(HOME)
+                return super().realpath(path)
+
+        fs = FS(HOME, None)
+        assert fs.validpath(os.path.join(HOME, 'bar'))
+        assert not fs.validpath(escaping)
+
     if hasattr(os, 'symlink'):
 
         def test_validpath_validlink(self):
@@ -193,6 +221,26 @@ class TestAbstractedFS(PyftpdlibTestCase):
                 finally:
                     safe_rmpath(testfn)
 
+        def test_validpath_external_symlink_dir(self):
+            # Test validpath with a path having a symlink pointing
+            # outside the root directory as an intermediate component.
+            fs = AbstractedFS(HOME, None)
+            testfn = self.get_testfn()
+            with tempfile.TemporaryDirectory() as tmpdir:
+                if os.path.realpath(tmpdir).startswith(HOME + os.sep):
+                    pytest.skip("temporary directory is inside root")
+                touch(os.path.join(tmpdir, 'foo'))
+                os.symlink(tmpdir, testfn)
+                try:
+                    assert not fs.validpath(testfn)
+                    assert not fs.validpath(os.path.join(testfn, 'foo'))
+                    assert not fs.validpath(os.path.join(testfn, 'bar'))
+                    # not existing path with no symlinks: still valid
+                    assert fs.validpath(os.path.join(HOME, 'bar', 'baz'))
+                finally:
+                    # safe_rmpath() can't remove a symlink to a directory
+                    os.remove(testfn)
+
 
 @pytest.mark.skipif(not POSIX, reason="UNIX only")
 class TestUnixFilesystem(PyftpdlibTestCase):
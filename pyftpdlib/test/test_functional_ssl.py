@@ -7,8 +7,8 @@ import ftplib
 import os
 import ssl
 
-import OpenSSL  # requires "pip install pyopenssl"
 import pytest
+from OpenSSL import SSL  # requires "pip install pyopenssl"
 
 from pyftpdlib.handlers import TLS_FTPHandler
 
@@ -40,8 +40,6 @@ CERTFILE = os.path.abspath(
     os.path.join(os.path.dirname(__file__), 'keycert.pem')
 )
 
-del OpenSSL
-
 # =====================================================================
 # --- FTPS mixin tests
 # =====================================================================
@@ -182,6 +180,25 @@ class TestFTPS(PyftpdlibTestCase):
         self.client = ftplib.FTP_TLS(timeout=GLOBAL_TIMEOUT)
         self.client.connect(self.server.host, self.server.port)
 
+    def _setup_own_context(self):
+        """Like _setup() but with a handler subclass owning its SSL
+        context, which is returned so that it can be tweaked by the
+        test without affecting the other ones.
+        """
+
+        class Handler(TLS_FTPHandler):
+            ssl_protocol = SSL.TLS_SERVER_METHOD
+            ssl_context = None
+
+        class Server(FTPSServer):
+            handler = Handler
+
+        self.server = Server()
+        self.server.start()
+        self.client = ftplib.FTP_TLS(timeout=GLOBAL_TIMEOUT)
+        self.client.connect(self.server.host, self.server.port)
+        return Handler.get_ssl_context()
+
     def setUp(self):
         super().setUp()
         self.client = None
@@ -266,6 +283,44 @@ class TestFTPS(PyftpdlibTestCase):
                     break
             assert not isinstance(sock, ssl.SSLSocket)
 
+    def test_prot_session_reuse_verify_peer(self):
+        # with peer verification on, OpenSSL refuses to resume a
+        # session unless the server set a session id context: the
+        # data channel is expected to resume the control session
+        ctx = self._setup_own_context()
+        ctx.set_verify(SSL.VERIFY_PEER, lambda *args: True)
+        self.client.login(secure=True)
+        self.client.prot_p()
+        conn, _ = ftplib.FTP.ntransfercmd(self.client, 'list')
+        sock = self.client.context.wrap_socket(
+            conn,
+            server_hostname=self.client.host,
+            session=self.client.sock.session,
+        )
+        with contextlib.closing(sock):
+            while True:
+                if not sock.recv(1024):
+                    self.client.voidresp()
+                    break
+            assert sock.session_reused
+
+    def test_tls_1_1_refused(self):
+        # TLSv1 and TLSv1.1 are disabled by default
+        # OpenSSL 3 already refuses TLSv1.1 at the default security
+        # level: lower it on both ends so that only ssl_options can
+        # make the handshake fail
+        server_ctx = self._setup_own_context()
+        server_ctx.set_cipher_list(b'DEFAULT:@SECLEVEL=0')
+        ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+        ctx.set_ciphers('DEFAULT:@SECLEVEL=0')
+        ctx.minimum_version = ssl.TLSVersion.TLSv1
+        ctx.maximum_version = ssl.TLSVersion.TLSv1_1
+        self.client.context = ctx
+        with pytest.raises(ssl.SSLError):
+            self.client.auth()
+
     def test_feat(self):
         self._setup()
         feat = self.client.sendcmd('feat')
@@ -5,10 +5,12 @@
 import contextlib
 import ftplib
 import socket
+from unittest.mock import patch
 
 import pytest
 
 from pyftpdlib import handlers
+from pyftpdlib import prefork
 from pyftpdlib import servers
 
 from . import GLOBAL_TIMEOUT
@@ -71,6 +73,24 @@ class TestFTPServer(PyftpdlibTestCase):
             assert server is not None
 
 
+class TestCpuCount(PyftpdlibTestCase):
+    """Tests for prefork.cpu_count()."""
+
+    def test_affinity(self):
+        # the CPUs the process may run on, not the ones on the machine
+        with patch(
+            "os.sched_getaffinity", return_value={0, 2}, create=True
+        ) as m:
+            assert prefork.cpu_count() == 2
+        m.assert_called_once_with(0)
+
+    def test_affinity_error(self):
+        with patch(
+            "os.sched_getaffinity", side_effect=OSError, create=True
+        ), patch("multiprocessing.cpu_count", return_value=7):
+            assert prefork.cpu_count() == 7
+
+
 # =====================================================================
 # --- threaded FTP server mixin tests
 # =====================================================================